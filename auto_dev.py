@@ -3,20 +3,29 @@ import os
 import csv
 import json
 import random
+import re
 import subprocess
-from datetime import datetime, timedelta
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import List, Dict, Optional, Callable, Tuple
+from typing import List, Dict, Optional, Callable, Tuple, Union
 
 
 REPO_DIR = Path(__file__).resolve().parent
 DESKTOP = Path('/Users/xinyuwang/Desktop')
 ACCOUNTS_CSV = DESKTOP / 'github_accounts.csv'
 PROJECT_DESC = DESKTOP / 'project_description.txt'
+BRANCH = 'main'
+HOUR = 3600
+DAY = 24 * HOUR
 
 
 def run(cmd: List[str], env: Optional[dict] = None) -> None:
-    subprocess.run(cmd, cwd=str(REPO_DIR), env=env, check=True)
+    # Nothing sensitive is inherited: Python opens its fds non-inheritable, so every git call in
+    # this script skips the close_fds sweep
+    subprocess.run(cmd, cwd=REPO_DIR, env=env, check=True, close_fds=False)
 
 
 def read_accounts(csv_path: Path) -> List[Dict[str, str]]:
@@ -31,207 +40,349 @@ def read_accounts(csv_path: Path) -> List[Dict[str, str]]:
     return accounts
 
 
-def set_git_author(name: str, email: str) -> None:
-    run(['git', 'config', 'user.name', name])
-    run(['git', 'config', 'user.email', email])
+def set_remote_url(name: str, url: str) -> None:
+    # Edit .git/config in place rather than probing with `git remote` first
+    config_path = REPO_DIR / '.git' / 'config'
+    text = config_path.read_text(encoding='utf-8')
+    header = f'[remote "{name}"]'
+    lines = text.splitlines(keepends=True)
+    start = next((i for i, line in enumerate(lines) if line.strip() == header), None)
+    if start is None:
+        if text and not text.endswith('\n'):
+            text += '\n'
+        text += f'{header}\n\turl = {url}\n\tfetch = +refs/heads/*:refs/remotes/{name}/*\n'
+    else:
+        # The section runs until the next line that opens another section
+        end = next((i for i in range(start + 1, len(lines)) if lines[i].lstrip().startswith('[')), len(lines))
+        url_key = re.compile(r'^(\s*url\s*=)', re.I)
+        for i in range(start + 1, end):
+            match = url_key.match(lines[i])
+            if match:
+                old_lines = list(lines)
+                lines[i] = f'{match.group(1)} {url}' + ('\n' if lines[i].endswith('\n') else '')
+                # Only the url line may change; the rest of the section and later sections must survive
+                if sum(a != b for a, b in zip(old_lines, lines)) > 1:
+                    raise RuntimeError(f'Rewriting the url of remote {name} would alter other lines of {config_path}')
+                break
+        else:
+            lines.insert(start + 1, f'\turl = {url}\n')
+        text = ''.join(lines)
+    config_path.write_text(text, encoding='utf-8')
+
+
+def current_tip(branch: str) -> Optional[str]:
+    proc = subprocess.run(['git', 'rev-parse', '--verify', '-q', f'refs/heads/{branch}^{{commit}}'],
+                          cwd=REPO_DIR, capture_output=True, text=True, close_fds=False)
+    return proc.stdout.strip() or None
+
+
+def read_tree(commit: str) -> Dict[str, bytes]:
+    # Contents of every file in `commit`, read with one ls-tree and one cat-file --batch
+    listing = subprocess.run(['git', 'ls-tree', '-r', '-z', commit], cwd=REPO_DIR,
+                             capture_output=True, check=True, close_fds=False).stdout
+    entries: List[Tuple[str, bytes]] = []
+    for record in listing.split(b'\0'):
+        if not record:
+            continue
+        meta, path = record.split(b'\t', 1)
+        _, kind, sha = meta.split()
+        if kind == b'blob':
+            entries.append((path.decode('utf-8'), sha))
+    batch = subprocess.run(['git', 'cat-file', '--batch'], cwd=REPO_DIR, input=b''.join(sha + b'\n' for _, sha in entries),
+                           capture_output=True, check=True, close_fds=False).stdout
+    tree: Dict[str, bytes] = {}
+    pos = 0
+    for path, _ in entries:
+        # Each object comes back as "<sha> <type> <size>\n<contents>\n"
+        header_end = batch.index(b'\n', pos)
+        size = int(batch[pos:header_end].split()[2])
+        tree[path] = batch[header_end + 1:header_end + 1 + size]
+        pos = header_end + 1 + size + 1
+    return tree
+
+
+def fast_import_commit(message: str, when: int, name: str, email: str, mark: int,
+                       parent: Optional[str], files: Dict[str, bytes]) -> bytes:
+    # One `commit` record of the fast-import stream, with file contents inlined
+    ident = f'{name} <{email}> {when} +0000'
+    msg = message.encode('utf-8')
+    parts = [
+        f'commit refs/heads/{BRANCH}\nmark :{mark}\nauthor {ident}\ncommitter {ident}\n'.encode('utf-8'),
+        b'data %d\n' % len(msg), msg, b'\n',
+    ]
+    if parent:
+        parts.append(f'from {parent}\n'.encode('utf-8'))
+    for path, data in files.items():
+        parts += [f'M 100644 inline {path}\n'.encode('utf-8'), b'data %d\n' % len(data), data, b'\n']
+    parts.append(b'\n')
+    return b''.join(parts)
 
 
-def commit_all(message: str, when: datetime, name: str, email: str) -> bool:
-    os.environ['GIT_AUTHOR_DATE'] = when.strftime('%Y-%m-%d %H:%M:%S +0000')
-    os.environ['GIT_COMMITTER_DATE'] = os.environ['GIT_AUTHOR_DATE']
-    set_git_author(name, email)
-    run(['git', 'add', '-A'])
-    # Check if there is anything to commit
-    proc = subprocess.run(['git', 'diff', '--cached', '--quiet', '--exit-code'], cwd=str(REPO_DIR))
-    if proc.returncode == 0:
-        return False
-    run(['git', 'commit', '-m', message])
-    return True
+class Append(bytes):
+    """Content added to the end of a file instead of replacing it."""
 
 
-def write_file(path: Path, content: str) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(content, encoding='utf-8')
+class EnsureLine(bytes):
+    """A line appended to a file only when the file does not contain it yet."""
+
+
+# Each action returns the files it changes, keyed by repo-relative path
+Action = Callable[[], Dict[str, bytes]]
 
 
-def append_file(path: Path, content: str) -> None:
+def apply_changes(tree: Dict[str, bytes], changes: Dict[str, bytes]) -> Dict[str, bytes]:
+    # Fold an action's output into the in-memory tree and return the paths that really changed
+    changed: Dict[str, bytes] = {}
+    for path, data in changes.items():
+        if isinstance(data, EnsureLine):
+            current = tree.get(path, b'')
+            if data.rstrip(b'\n') in current.splitlines():
+                continue
+            data = current + (b'\n' if current and not current.endswith(b'\n') else b'') + data
+        elif isinstance(data, Append):
+            data = tree.get(path, b'') + data
+        if tree.get(path) != data:
+            tree[path] = changed[path] = data
+    return changed
+
+
+def write_file(path: Path, content: Union[str, bytes]) -> None:
+    data = content.encode('utf-8') if isinstance(content, str) else content
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open('a', encoding='utf-8') as f:
-        f.write(content)
+    # Write raw bytes to a sibling temp file and swap it in, so readers never see a partial file
+    tmp = path.with_name(path.name + '.tmp')
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp, path)
+    except BaseException:
+        # Don't leave a stray .tmp next to the file on failure
+        tmp.unlink(missing_ok=True)
+        raise
 
 
 def json_pretty(data: dict) -> str:
     return json.dumps(data, indent=2, ensure_ascii=False) + "\n"
 
 
-def dates_between(start: str, end: str, count: int) -> List[datetime]:
-    start_dt = datetime.strptime(start, '%Y-%m-%d')
-    end_dt = datetime.strptime(end, '%Y-%m-%d')
-    total_days = (end_dt - start_dt).days
+def unix_day(day: str) -> int:
+    return int(datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=timezone.utc).timestamp())
+
+
+def dates_between(start: str, end: str, hours: List[int], minutes: List[int]) -> List[int]:
+    # Raw UTC Unix timestamps, which fast-import takes as-is with --date-format=raw
+    start_ts = unix_day(start)
+    end_ts = unix_day(end)
+    total_days = (end_ts - start_ts) // DAY
+    count = len(hours)
     if count <= 0:
         return []
     step = max(1, total_days // count)
-    dates: List[datetime] = []
-    current = start_dt + timedelta(days=1)
-    for i in range(count):
-        jitter_hours = random.randint(9, 20)  # workday-ish hours
-        jitter_minutes = random.randint(0, 59)
-        dt = current + timedelta(hours=jitter_hours, minutes=jitter_minutes)
-        if dt > end_dt:
-            dt = end_dt - timedelta(hours=random.randint(1, 6))
-        dates.append(dt)
-        current += timedelta(days=step)
-    # Ensure monotonic
-    dates.sort()
+    first = start_ts + DAY
+    dates = [first + i * step * DAY + h * HOUR + m * 60 for i, (h, m) in enumerate(zip(hours, minutes))]
+    clamped = False
+    for i, ts in enumerate(dates):
+        if ts > end_ts:
+            dates[i] = end_ts - random.randint(1, 6) * HOUR
+            clamped = True
+    # Ensure monotonic; the dates can only fall out of order when one was clamped
+    if clamped:
+        dates.sort()
     return dates
 
 
-def ensure_initial_gitignore() -> None:
-    # .gitignore is already created by the assistant; ensure it exists when running standalone
-    gi = REPO_DIR / '.gitignore'
-    if not gi.exists():
-        write_file(gi, '\n'.join([
-            'node_modules/', '.next/', 'dist/', 'build/', 'coverage/', '.env', '.env.local', '*.log',
-            '.DS_Store', '.idea/', '.vscode/', 'github_accounts.csv', 'project_description.txt',
-            'artifacts/', 'cache/', '*.tmp', '*.bak', '**/*.local.*', ''
-        ]))
+def phase_dates_between(spans: List[Tuple[str, str, int]]) -> List[List[int]]:
+    # Draw the jitter for every phase in one go and hand each phase its slice
+    total = sum(count for _, _, count in spans)
+    hours = random.choices(range(9, 21), k=total)  # workday-ish hours
+    minutes = random.choices(range(60), k=total)
+    phase_dates: List[List[int]] = []
+    offset = 0
+    for start, end, count in spans:
+        phase_dates.append(dates_between(start, end, hours[offset:offset + count], minutes[offset:offset + count]))
+        offset += count
+    return phase_dates
+
 
+DEFAULT_GITIGNORE = (
+    b'node_modules/\n.next/\ndist/\nbuild/\ncoverage/\n.env\n.env.local\n*.log\n'
+    b'.DS_Store\n.idea/\n.vscode/\ngithub_accounts.csv\nproject_description.txt\n'
+    b'artifacts/\ncache/\n*.tmp\n*.bak\n**/*.local.*\n'
+)
 
-def phase_init_commits() -> List[Tuple[str, Callable[[], None]]]:
-    commits: List[Tuple[str, Callable[[], None]]] = []
+
+def bootstrap() -> bytes:
+    # One directory scan answers both "is this a repo" and "is .gitignore there"
+    entries = {entry.name for entry in os.scandir(REPO_DIR)}
+    if '.git' not in entries:
+        run(['git', 'init', '-b', BRANCH])
+    # .gitignore is already created by the assistant; ensure it exists when running standalone
+    if '.gitignore' not in entries:
+        write_file(REPO_DIR / '.gitignore', DEFAULT_GITIGNORE)
+        return DEFAULT_GITIGNORE
+    return (REPO_DIR / '.gitignore').read_bytes()
+
+
+# Static payloads of the init phase, built once at import time
+README_MD = (
+    b'# MintLite\n\n'
+    b'MintLite is a lightweight NFT minting platform for creators and users.\n\n'
+    b'Key capabilities:\n\n'
+    b'- ERC-721 and ERC-1155 minting (single and batch)\n'
+    b'- Wallet connection with MetaMask / WalletConnect\n'
+    b'- IPFS/Arweave metadata storage\n'
+    b'- L2 chains support (Polygon, Arbitrum)\n\n'
+    b'This repository contains smart contracts, a Next.js dApp, and scripts to deploy and test the system.\n'
+)
+
+LICENSE_TXT = (
+    b'MIT License\n\n'
+    b'Copyright (c) 2024 MintLite Contributors\n\n'
+    b'Permission is hereby granted, free of charge, to any person obtaining a copy\n'
+    b'of this software and associated documentation files (the "Software"), to deal\n'
+    b'in the Software without restriction, including without limitation the rights\n'
+    b'to use, copy, modify, merge, publish, distribute, sublicense, and/or sell\n'
+    b'copies of the Software, and to permit persons to whom the Software is\n'
+    b'furnished to do so, subject to the following conditions:\n\n'
+    b'The above copyright notice and this permission notice shall be included in all\n'
+    b'copies or substantial portions of the Software.\n\n'
+    b'THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR\n'
+    b'IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,\n'
+    b'FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE\n'
+    b'AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER\n'
+    b'LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,\n'
+    b'OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE\n'
+    b'SOFTWARE.\n'
+)
+
+PACKAGE_JSON = json_pretty({
+    'name': 'mintlite',
+    'version': '0.1.0',
+    'private': True,
+    'scripts': {
+        'dev': 'next dev',
+        'build': 'next build',
+        'start': 'next start',
+        'lint': 'eslint .'
+    },
+    'dependencies': {
+        'next': '14.2.5',
+        'react': '18.3.1',
+        'react-dom': '18.3.1',
+        'wagmi': '2.10.7',
+        '@rainbow-me/rainbowkit': '2.1.7'
+    },
+    'devDependencies': {
+        'typescript': '5.5.4',
+        'eslint': '9.9.0',
+        '@types/node': '20.14.10',
+        '@types/react': '18.3.3',
+        '@types/react-dom': '18.3.0'
+    }
+}).encode()
+
+TSCONFIG_JSON = json_pretty({
+    'compilerOptions': {
+        'target': 'ES2022',
+        'lib': ['dom', 'es2022'],
+        'jsx': 'preserve',
+        'module': 'esnext',
+        'moduleResolution': 'bundler',
+        'baseUrl': '.',
+        'paths': {'@/*': ['*']},
+        'strict': True,
+        'noEmit': True
+    },
+    'include': ['**/*.ts', '**/*.tsx']
+}).encode()
+
+NEXT_CONFIG_JS = (
+    b'/** @type {import("next").NextConfig} */\n'
+    b'const nextConfig = { reactStrictMode: true };\n'
+    b'module.exports = nextConfig;\n'
+)
+
+HOME_PAGE_TSX = (
+    b'export default function Home() {\n'
+    b'  return (\n'
+    b'    <main style={{padding: 24}}>\n'
+    b'      <h1>MintLite</h1>\n'
+    b'      <p>Lightweight NFT minting platform.</p>\n'
+    b'    </main>\n'
+    b'  );\n'
+    b'}\n'
+)
+
+WALLET_CONNECTOR_TSX = (
+    b'"use client";\n'
+    b'import { ConnectButton } from "@rainbow-me/rainbowkit";\n'
+    b'export function WalletConnector(){\n'
+    b'  return <ConnectButton />;\n'
+    b'}\n'
+)
+
+EDITORCONFIG = (
+    b'root = true\n\n[*]\nindent_style = space\nindent_size = 2\ncharset = utf-8\nend_of_line = lf\ninsert_final_newline = true\n'
+)
+
+PRETTIERRC = json_pretty({
+    'singleQuote': True,
+    'semi': True,
+    'trailingComma': 'all'
+}).encode()
+
+ARCHITECTURE_MD = (
+    b'# Architecture\n\nFront-end (Next.js), Smart Contracts (Solidity with OpenZeppelin), and Off-chain services for IPFS.\n'
+)
+
+CONTRIBUTING_MD = (
+    b'# Contributing\n\nPlease open issues and PRs. Follow Conventional Commits and keep changes focused.\n'
+)
+
+
+def phase_init_commits() -> List[Tuple[str, Action]]:
+    commits: List[Tuple[str, Action]] = []
 
     def c1():
-        readme = REPO_DIR / 'README.md'
-        content = (
-            '# MintLite\n\n'
-            'MintLite is a lightweight NFT minting platform for creators and users.\n\n'
-            'Key capabilities:\n\n'
-            '- ERC-721 and ERC-1155 minting (single and batch)\n'
-            '- Wallet connection with MetaMask / WalletConnect\n'
-            '- IPFS/Arweave metadata storage\n'
-            '- L2 chains support (Polygon, Arbitrum)\n\n'
-            'This repository contains smart contracts, a Next.js dApp, and scripts to deploy and test the system.\n'
-        )
-        write_file(readme, content)
+        return {'README.md': README_MD}
 
     def c2():
-        license_txt = (
-            'MIT License\n\n'
-            'Copyright (c) 2024 MintLite Contributors\n\n'
-            'Permission is hereby granted, free of charge, to any person obtaining a copy\n'
-            'of this software and associated documentation files (the "Software"), to deal\n'
-            'in the Software without restriction, including without limitation the rights\n'
-            'to use, copy, modify, merge, publish, distribute, sublicense, and/or sell\n'
-            'copies of the Software, and to permit persons to whom the Software is\n'
-            'furnished to do so, subject to the following conditions:\n\n'
-            'The above copyright notice and this permission notice shall be included in all\n'
-            'copies or substantial portions of the Software.\n\n'
-            'THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR\n'
-            'IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,\n'
-            'FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE\n'
-            'AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER\n'
-            'LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,\n'
-            'OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE\n'
-            'SOFTWARE.\n'
-        )
-        write_file(REPO_DIR / 'LICENSE', license_txt)
+        return {'LICENSE': LICENSE_TXT}
 
     def c3():
-        pkg = {
-            'name': 'mintlite',
-            'version': '0.1.0',
-            'private': True,
-            'scripts': {
-                'dev': 'next dev',
-                'build': 'next build',
-                'start': 'next start',
-                'lint': 'eslint .'
-            },
-            'dependencies': {
-                'next': '14.2.5',
-                'react': '18.3.1',
-                'react-dom': '18.3.1',
-                'wagmi': '2.10.7',
-                '@rainbow-me/rainbowkit': '2.1.7'
-            },
-            'devDependencies': {
-                'typescript': '5.5.4',
-                'eslint': '9.9.0',
-                '@types/node': '20.14.10',
-                '@types/react': '18.3.3',
-                '@types/react-dom': '18.3.0'
-            }
-        }
-        write_file(REPO_DIR / 'package.json', json_pretty(pkg))
+        return {'package.json': PACKAGE_JSON}
 
     def c4():
-        write_file(REPO_DIR / 'tsconfig.json', json_pretty({
-            'compilerOptions': {
-                'target': 'ES2022',
-                'lib': ['dom', 'es2022'],
-                'jsx': 'preserve',
-                'module': 'esnext',
-                'moduleResolution': 'bundler',
-                'baseUrl': '.',
-                'paths': {'@/*': ['*']},
-                'strict': True,
-                'noEmit': True
-            },
-            'include': ['**/*.ts', '**/*.tsx']
-        }))
+        return {'tsconfig.json': TSCONFIG_JSON}
 
     def c5():
-        write_file(REPO_DIR / 'next.config.js', (
-            '/** @type {import("next").NextConfig} */\n'
-            'const nextConfig = { reactStrictMode: true };\n'
-            'module.exports = nextConfig;\n'
-        ))
+        return {'next.config.js': NEXT_CONFIG_JS}
 
     def c6():
-        write_file(REPO_DIR / 'app/page.tsx', (
-            'export default function Home() {\n'
-            '  return (\n'
-            '    <main style={{padding: 24}}>\n'
-            '      <h1>MintLite</h1>\n'
-            '      <p>Lightweight NFT minting platform.</p>\n'
-            '    </main>\n'
-            '  );\n'
-            '}\n'
-        ))
+        return {'app/page.tsx': HOME_PAGE_TSX}
 
     def c7():
-        write_file(REPO_DIR / 'components/WalletConnector.tsx', (
-            '"use client";\n'
-            'import { ConnectButton } from "@rainbow-me/rainbowkit";\n'
-            'export function WalletConnector(){\n'
-            '  return <ConnectButton />;\n'
-            '}\n'
-        ))
+        return {'components/WalletConnector.tsx': WALLET_CONNECTOR_TSX}
 
     def c8():
-        write_file(REPO_DIR / '.editorconfig', (
-            'root = true\n\n[*]\nindent_style = space\nindent_size = 2\ncharset = utf-8\nend_of_line = lf\ninsert_final_newline = true\n'
-        ))
+        return {'.editorconfig': EDITORCONFIG}
 
     def c9():
-        write_file(REPO_DIR / '.prettierrc', json_pretty({
-            'singleQuote': True,
-            'semi': True,
-            'trailingComma': 'all'
-        }))
+        return {'.prettierrc': PRETTIERRC}
 
     def c10():
-        write_file(REPO_DIR / 'docs/architecture.md', (
-            '# Architecture\n\nFront-end (Next.js), Smart Contracts (Solidity with OpenZeppelin), and Off-chain services for IPFS.\n'
-        ))
+        return {'docs/architecture.md': ARCHITECTURE_MD}
 
     def c11():
-        write_file(REPO_DIR / 'CONTRIBUTING.md', (
-            '# Contributing\n\nPlease open issues and PRs. Follow Conventional Commits and keep changes focused.\n'
-        ))
+        return {'CONTRIBUTING.md': CONTRIBUTING_MD}
 
     def c12():
-        write_file(REPO_DIR / '.gitignore', (REPO_DIR / '.gitignore').read_text(encoding='utf-8'))
+        return {'.gitignore': EnsureLine(b'artifacts-cache/\n')}
 
     commits.append(('docs: add README with project overview', c1))
     commits.append(('docs: add MIT license', c2))
@@ -244,96 +395,115 @@ def phase_init_commits() -> List[Tuple[str, Callable[[], None]]]:
     commits.append(('chore: add prettier config', c9))
     commits.append(('docs: add initial architecture doc', c10))
     commits.append(('docs: add contributing guide', c11))
-    commits.append(('chore: ensure .gitignore present and correct', c12))
+    commits.append(('chore: ignore artifacts cache directory', c12))
     return commits
 
 
-def phase_core_commits() -> List[Tuple[str, Callable[[], None]]]:
-    commits: List[Tuple[str, Callable[[], None]]] = []
+# Same layout json_pretty produces for an example, without going through json
+EXAMPLE_TMPL = (
+    '{{\n'
+    '  "name": "MintLite Example #{i}",\n'
+    '  "description": "Example NFT metadata used for testing and demos.",\n'
+    '  "attributes": [\n'
+    '    {{\n'
+    '      "trait_type": "rarity",\n'
+    '      "value": "{r}"\n'
+    '    }},\n'
+    '    {{\n'
+    '      "trait_type": "edition",\n'
+    '      "value": {i}\n'
+    '    }}\n'
+    '  ]\n'
+    '}}\n'
+)
+RARITIES = ['common', 'uncommon', 'rare', 'legendary']
+
+
+def emit_example(idx: int, rarity: str) -> Dict[str, bytes]:
+    return {f'examples/metadata/example_{idx:02d}.json': EXAMPLE_TMPL.format_map({'i': idx, 'r': rarity}).encode()}
+
+
+# Static payloads of the core phase
+NFT_COLLECTION_SOL = (
+    b'// SPDX-License-Identifier: MIT\n'
+    b'pragma solidity ^0.8.23;\n\n'
+    b'import "@openzeppelin/contracts/token/ERC721/extensions/ERC721URIStorage.sol";\n'
+    b'import "@openzeppelin/contracts/access/Ownable.sol";\n\n'
+    b'contract NFTCollection is ERC721URIStorage, Ownable {\n'
+    b'    uint256 public nextTokenId;\n\n'
+    b'    constructor() ERC721("MintLiteNFT", "MLNFT") {}\n\n'
+    b'    function mint(address to, string memory tokenURI) external onlyOwner returns (uint256) {\n'
+    b'        uint256 tokenId = ++nextTokenId;\n'
+    b'        _safeMint(to, tokenId);\n'
+    b'        _setTokenURI(tokenId, tokenURI);\n'
+    b'        return tokenId;\n'
+    b'    }\n\n'
+    b'    function batchMint(address to, string[] calldata tokenURIs) external onlyOwner returns (uint256[] memory) {\n'
+    b'        uint256[] memory minted = new uint256[](tokenURIs.length);\n'
+    b'        for (uint256 i = 0; i < tokenURIs.length; i++) {\n'
+    b'            uint256 tokenId = ++nextTokenId;\n'
+    b'            _safeMint(to, tokenId);\n'
+    b'            _setTokenURI(tokenId, tokenURIs[i]);\n'
+    b'            minted[i] = tokenId;\n'
+    b'        }\n'
+    b'        return minted;\n'
+    b'    }\n'
+    b'}\n'
+)
+
+UPLOAD_FORM_TSX = (
+    b'import { useState } from "react";\n'
+    b'export function UploadForm(){\n'
+    b'  const [name, setName] = useState("");\n'
+    b'  const [description, setDescription] = useState("");\n'
+    b'  return (\n'
+    b'    <form style={{display:"grid", gap:12}}>\n'
+    b'      <input placeholder="Name" value={name} onChange={e=>setName(e.target.value)} />\n'
+    b'      <textarea placeholder="Description" value={description} onChange={e=>setDescription(e.target.value)} />\n'
+    b'      <button type="button">Prepare Metadata</button>\n'
+    b'    </form>\n'
+    b'  );\n'
+    b'}\n'
+)
+
+METADATA_TS = (
+    b'export type Attribute = { trait_type: string; value: string | number };\n'
+    b'export type Metadata = {\n'
+    b'  name: string; description: string; image?: string; attributes?: Attribute[];\n'
+    b'};\n'
+    b'export function buildMetadata(input: Metadata){\n'
+    b'  return JSON.stringify(input, null, 2);\n'
+    b'}\n'
+)
+
+CONTRACTS_MD = (
+    b'# Contracts\n\n`NFTCollection` implements ERC721 with single and batch minting.\n'
+)
+
+GENERATE_METADATA_TS = (
+    b'import { writeFileSync } from "node:fs";\n'
+    b'const data = { name: "Sample", description: "Demo", attributes: [] };\n'
+    b'writeFileSync("examples/metadata/sample.json", JSON.stringify(data, null, 2));\n'
+)
+
+
+def phase_core_commits() -> List[Tuple[str, Action]]:
+    commits: List[Tuple[str, Action]] = []
 
     def c1():
-        content = (
-            '// SPDX-License-Identifier: MIT\n'
-            'pragma solidity ^0.8.23;\n\n'
-            'import "@openzeppelin/contracts/token/ERC721/extensions/ERC721URIStorage.sol";\n'
-            'import "@openzeppelin/contracts/access/Ownable.sol";\n\n'
-            'contract NFTCollection is ERC721URIStorage, Ownable {\n'
-            '    uint256 public nextTokenId;\n\n'
-            '    constructor() ERC721("MintLiteNFT", "MLNFT") {}\n\n'
-            '    function mint(address to, string memory tokenURI) external onlyOwner returns (uint256) {\n'
-            '        uint256 tokenId = ++nextTokenId;\n'
-            '        _safeMint(to, tokenId);\n'
-            '        _setTokenURI(tokenId, tokenURI);\n'
-            '        return tokenId;\n'
-            '    }\n\n'
-            '    function batchMint(address to, string[] calldata tokenURIs) external onlyOwner returns (uint256[] memory) {\n'
-            '        uint256[] memory minted = new uint256[](tokenURIs.length);\n'
-            '        for (uint256 i = 0; i < tokenURIs.length; i++) {\n'
-            '            uint256 tokenId = ++nextTokenId;\n'
-            '            _safeMint(to, tokenId);\n'
-            '            _setTokenURI(tokenId, tokenURIs[i]);\n'
-            '            minted[i] = tokenId;\n'
-            '        }\n'
-            '        return minted;\n'
-            '    }\n'
-            '}\n'
-        )
-        write_file(REPO_DIR / 'contracts/NFTCollection.sol', content)
+        return {'contracts/NFTCollection.sol': NFT_COLLECTION_SOL}
 
     def c2():
-        content = (
-            'import { useState } from "react";\n'
-            'export function UploadForm(){\n'
-            '  const [name, setName] = useState("");\n'
-            '  const [description, setDescription] = useState("");\n'
-            '  return (\n'
-            '    <form style={{display:"grid", gap:12}}>\n'
-            '      <input placeholder="Name" value={name} onChange={e=>setName(e.target.value)} />\n'
-            '      <textarea placeholder="Description" value={description} onChange={e=>setDescription(e.target.value)} />\n'
-            '      <button type="button">Prepare Metadata</button>\n'
-            '    </form>\n'
-            '  );\n'
-            '}\n'
-        )
-        write_file(REPO_DIR / 'components/UploadForm.tsx', content)
+        return {'components/UploadForm.tsx': UPLOAD_FORM_TSX}
 
     def c3():
-        helper = (
-            'export type Attribute = { trait_type: string; value: string | number };\n'
-            'export type Metadata = {\n'
-            '  name: string; description: string; image?: string; attributes?: Attribute[];\n'
-            '};\n'
-            'export function buildMetadata(input: Metadata){\n'
-            '  return JSON.stringify(input, null, 2);\n'
-            '}\n'
-        )
-        write_file(REPO_DIR / 'lib/metadata.ts', helper)
+        return {'lib/metadata.ts': METADATA_TS}
 
     def c4():
-        write_file(REPO_DIR / 'docs/contracts.md', (
-            '# Contracts\n\n`NFTCollection` implements ERC721 with single and batch minting.\n'
-        ))
+        return {'docs/contracts.md': CONTRACTS_MD}
 
     def c5():
-        write_file(REPO_DIR / 'scripts/generate_metadata.ts', (
-            'import { writeFileSync } from "node:fs";\n'
-            'const data = { name: "Sample", description: "Demo", attributes: [] };\n'
-            'writeFileSync("examples/metadata/sample.json", JSON.stringify(data, null, 2));\n'
-        ))
-
-    # Add many incremental, meaningful commits for examples and docs
-    def add_example(idx: int):
-        def inner():
-            data = {
-                'name': f'MintLite Example #{idx}',
-                'description': 'Example NFT metadata used for testing and demos.',
-                'attributes': [
-                    {'trait_type': 'rarity', 'value': random.choice(['common', 'uncommon', 'rare', 'legendary'])},
-                    {'trait_type': 'edition', 'value': idx},
-                ]
-            }
-            write_file(REPO_DIR / f'examples/metadata/example_{idx:02d}.json', json_pretty(data))
-        return inner
+        return {'scripts/generate_metadata.ts': GENERATE_METADATA_TS}
 
     commits.extend([
         ('feat: add ERC-721 NFTCollection with batchMint', c1),
@@ -344,36 +514,48 @@ def phase_core_commits() -> List[Tuple[str, Callable[[], None]]]:
     ])
 
     # 39 more commits of examples/docs to make core phase dense
-    for i in range(1, 40):
-        commits.append((f'docs: add metadata example #{i:02d}', add_example(i)))
+    examples = zip(range(1, 40), random.choices(RARITIES, k=39))
+    commits.extend((f'docs: add metadata example #{i:02d}', partial(emit_example, i, r)) for i, r in examples)
 
     return commits
 
 
-def phase_test_commits() -> List[Tuple[str, Callable[[], None]]]:
-    commits: List[Tuple[str, Callable[[], None]]] = []
+# Static payloads of the test phase
+NFT_COLLECTION_TEST_MD = (
+    b'# NFTCollection Tests\n\nThe test plan covers single and batch mint behavior, ownership, and URI assignment.\n'
+)
+
+JEST_CONFIG_JS = (
+    b'module.exports = { testEnvironment: "jsdom" };\n'
+)
+
+UPLOAD_FORM_TEST_TSX = (
+    b'describe("UploadForm", () => { it("renders", () => { expect(true).toBe(true); }); });\n'
+)
+
+ARCHITECTURE_TESTING_MD = (
+    b'\n\nTesting strategy includes unit tests for contracts and React components.\n'
+)
+
+
+def phase_test_commits() -> List[Tuple[str, Action]]:
+    commits: List[Tuple[str, Action]] = []
 
     def c1():
-        write_file(REPO_DIR / 'test/contracts/NFTCollection.test.md', (
-            '# NFTCollection Tests\n\nThe test plan covers single and batch mint behavior, ownership, and URI assignment.\n'
-        ))
+        return {'test/contracts/NFTCollection.test.md': NFT_COLLECTION_TEST_MD}
 
     def c2():
-        write_file(REPO_DIR / 'jest.config.js', (
-            'module.exports = { testEnvironment: "jsdom" };\n'
-        ))
+        return {'jest.config.js': JEST_CONFIG_JS}
 
     def c3():
-        write_file(REPO_DIR / 'components/__tests__/UploadForm.test.tsx', (
-            'describe("UploadForm", () => { it("renders", () => { expect(true).toBe(true); }); });\n'
-        ))
+        return {'components/__tests__/UploadForm.test.tsx': UPLOAD_FORM_TEST_TSX}
 
     def c4():
-        append_file(REPO_DIR / 'docs/architecture.md', '\n\nTesting strategy includes unit tests for contracts and React components.\n')
+        return {'docs/architecture.md': Append(ARCHITECTURE_TESTING_MD)}
 
     def add_more_test_doc(i: int):
         def inner():
-            append_file(REPO_DIR / 'test/TEST_PLAN.md', f"- Case {i}: validate metadata schema for example {i}.\n")
+            return {'test/TEST_PLAN.md': Append(f"- Case {i}: validate metadata schema for example {i}.\n".encode())}
         return inner
 
     commits.extend([
@@ -389,66 +571,102 @@ def phase_test_commits() -> List[Tuple[str, Callable[[], None]]]:
     return commits
 
 
-def phase_docs_commits() -> List[Tuple[str, Callable[[], None]]]:
-    commits: List[Tuple[str, Callable[[], None]]] = []
+# Static payloads of the docs phase
+README_GETTING_STARTED_MD = (
+    b'\n## Getting Started\n\n'
+    b'Install dependencies, then run development server: `npm i && npm run dev`.\n'
+)
+
+SECURITY_MD = (
+    b'# Security Policy\n\nPlease report vulnerabilities via issues with minimal details first.\n'
+)
+
+CODE_OF_CONDUCT_MD = (
+    b'# Code of Conduct\n\nBe respectful and inclusive. Follow the Golden Rule.\n'
+)
+
+CHANGELOG_MD = (
+    b'# Changelog\n\nAll notable changes to this project will be documented here.\n'
+)
+
+BUG_REPORT_MD = (
+    b'---\nname: Bug report\nabout: Report a problem\n---\n\n**Describe the bug**\n\n**Steps to reproduce**\n'
+)
+
+FEATURE_REQUEST_MD = (
+    b'---\nname: Feature request\nabout: Propose an idea\n---\n\n**Problem**\n\n**Solution**\n'
+)
+
+CONTRACTS_SECURITY_MD = (
+    b'\nSecurity: uses OpenZeppelin base contracts and owner-gated minting.\n'
+)
+
+README_ROADMAP_MD = (
+    b'\n## Roadmap\n- Batch mint UI\n- ERC-1155 support\n- Marketplace integration (optional)\n'
+)
+
+DEPLOYMENT_MD = (
+    b'# Deployment\n\nUse Hardhat or Foundry to deploy `NFTCollection` and verify on block explorers.\n'
+)
+
+USAGE_MD = (
+    b'# Usage\n\nUse the UploadForm to prepare metadata and mint via the connected wallet.\n'
+)
+
+CHANGELOG_0_1_0_MD = (
+    b'\n- 0.1.0: Initial MVP artifacts and docs.\n'
+)
+
+TROUBLESHOOTING_MD = (
+    b'# Troubleshooting\n\nCheck wallet connection, RPC endpoints, and IPFS gateway availability.\n'
+)
+
+README_LICENSE_MD = (
+    b'\n## License\nMIT\n'
+)
+
+
+def phase_docs_commits() -> List[Tuple[str, Action]]:
+    commits: List[Tuple[str, Action]] = []
 
     def c1():
-        append_file(REPO_DIR / 'README.md', (
-            '\n## Getting Started\n\n'
-            'Install dependencies, then run development server: `npm i && npm run dev`.\n'
-        ))
+        return {'README.md': Append(README_GETTING_STARTED_MD)}
 
     def c2():
-        write_file(REPO_DIR / 'SECURITY.md', (
-            '# Security Policy\n\nPlease report vulnerabilities via issues with minimal details first.\n'
-        ))
+        return {'SECURITY.md': SECURITY_MD}
 
     def c3():
-        write_file(REPO_DIR / 'CODE_OF_CONDUCT.md', (
-            '# Code of Conduct\n\nBe respectful and inclusive. Follow the Golden Rule.\n'
-        ))
+        return {'CODE_OF_CONDUCT.md': CODE_OF_CONDUCT_MD}
 
     def c4():
-        write_file(REPO_DIR / 'CHANGELOG.md', (
-            '# Changelog\n\nAll notable changes to this project will be documented here.\n'
-        ))
+        return {'CHANGELOG.md': CHANGELOG_MD}
 
     def c5():
-        write_file(REPO_DIR / '.github/ISSUE_TEMPLATE/bug_report.md', (
-            '---\nname: Bug report\nabout: Report a problem\n---\n\n**Describe the bug**\n\n**Steps to reproduce**\n'
-        ))
+        return {'.github/ISSUE_TEMPLATE/bug_report.md': BUG_REPORT_MD}
 
     def c6():
-        write_file(REPO_DIR / '.github/ISSUE_TEMPLATE/feature_request.md', (
-            '---\nname: Feature request\nabout: Propose an idea\n---\n\n**Problem**\n\n**Solution**\n'
-        ))
+        return {'.github/ISSUE_TEMPLATE/feature_request.md': FEATURE_REQUEST_MD}
 
     def c7():
-        append_file(REPO_DIR / 'docs/contracts.md', '\nSecurity: uses OpenZeppelin base contracts and owner-gated minting.\n')
+        return {'docs/contracts.md': Append(CONTRACTS_SECURITY_MD)}
 
     def c8():
-        append_file(REPO_DIR / 'README.md', '\n## Roadmap\n- Batch mint UI\n- ERC-1155 support\n- Marketplace integration (optional)\n')
+        return {'README.md': Append(README_ROADMAP_MD)}
 
     def c9():
-        write_file(REPO_DIR / 'docs/deployment.md', (
-            '# Deployment\n\nUse Hardhat or Foundry to deploy `NFTCollection` and verify on block explorers.\n'
-        ))
+        return {'docs/deployment.md': DEPLOYMENT_MD}
 
     def c10():
-        write_file(REPO_DIR / 'docs/usage.md', (
-            '# Usage\n\nUse the UploadForm to prepare metadata and mint via the connected wallet.\n'
-        ))
+        return {'docs/usage.md': USAGE_MD}
 
     def c11():
-        append_file(REPO_DIR / 'CHANGELOG.md', '\n- 0.1.0: Initial MVP artifacts and docs.\n')
+        return {'CHANGELOG.md': Append(CHANGELOG_0_1_0_MD)}
 
     def c12():
-        write_file(REPO_DIR / 'docs/troubleshooting.md', (
-            '# Troubleshooting\n\nCheck wallet connection, RPC endpoints, and IPFS gateway availability.\n'
-        ))
+        return {'docs/troubleshooting.md': TROUBLESHOOTING_MD}
 
     def c13():
-        append_file(REPO_DIR / 'README.md', '\n## License\nMIT\n')
+        return {'README.md': Append(README_LICENSE_MD)}
 
     commits.extend([
         ('docs: add getting started to README', c1),
@@ -470,7 +688,7 @@ def phase_docs_commits() -> List[Tuple[str, Callable[[], None]]]:
 
 def main() -> None:
     random.seed(1337)
-    ensure_initial_gitignore()
+    gitignore = bootstrap()
     accounts = read_accounts(ACCOUNTS_CSV)
 
     # Build phases and desired commit counts
@@ -487,33 +705,79 @@ def main() -> None:
     ]
 
     # Compute dates for each phase
-    phase_dates: List[List[datetime]] = []
-    for (start, end, commits) in phases:
-        phase_dates.append(dates_between(start, end, len(commits)))
+    phase_dates = phase_dates_between([(start, end, len(commits)) for start, end, commits in phases])
 
     # Author rotation and counts
-    author_counts = {a['username']: 0 for a in accounts}
+    committed_by: List[str] = []
     author_index = 0
 
-    # Perform commits
-    for p_idx, (period, dates) in enumerate(zip(phases, phase_dates)):
-        _, _, commits = period
-        for c_idx, (message, action) in enumerate(commits):
-            # Apply change
-            action()
-            # Pick author in round-robin
-            author = accounts[author_index % len(accounts)]
-            author_index += 1
-            # Commit with timestamp
-            when = dates[c_idx]
-            did_commit = commit_all(message, when, author['username'], author['email'])
-            if did_commit:
-                author_counts[author['username']] += 1
+    # The final `checkout -f` and `branch -f master` assume the run starts on BRANCH, born or unborn;
+    # from any other branch they would replace its working tree and repoint master
+    head = subprocess.run(['git', 'symbolic-ref', '-q', 'HEAD'], cwd=REPO_DIR,
+                          capture_output=True, text=True, close_fds=False).stdout.strip()
+    if head != f'refs/heads/{BRANCH}':
+        raise RuntimeError(f'HEAD must be on {BRANCH}, found {head or "a detached HEAD"}; check out {BRANCH} before running.')
+    # The final `checkout -f` would also silently discard uncommitted edits to tracked files
+    if subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                      capture_output=True, check=True, close_fds=False).stdout:
+        raise RuntimeError('Tracked files have uncommitted changes; commit or stash them before running.')
+    parent = current_tip(BRANCH)
+    mark = 0
+    # Compare against what the branch already holds, so reruns skip actions that change nothing
+    tree = read_tree(parent) if parent else {}
+    # The first commit also carries the ignore rules
+    pending = apply_changes(tree, {'.gitignore': gitignore})
+
+    # Actions only return content, so build all of it in parallel; results keep commit order
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        phase_changes = [list(pool.map(lambda commit: commit[1](), commits)) for _, _, commits in phases]
+
+    # Stream every commit into a single fast-import process instead of running git per commit.
+    # A 64 KiB pipe buffer lets several small commit records go out in one write, and --done
+    # makes an interrupted stream fail instead of importing a partial history.
+    importer = subprocess.Popen(['git', 'fast-import', '--date-format=raw', '--quiet', '--done'],
+                                cwd=REPO_DIR, stdin=subprocess.PIPE, bufsize=64 * 1024, close_fds=False)
+    try:
+        # Perform commits
+        for p_idx, (period, dates, changes) in enumerate(zip(phases, phase_dates, phase_changes)):
+            _, _, commits = period
+            for c_idx, (message, _) in enumerate(commits):
+                # Apply change
+                pending.update(apply_changes(tree, changes[c_idx]))
+                # Pick author in round-robin
+                author = accounts[author_index % len(accounts)]
+                author_index += 1
+                # Skip actions that left the tree unchanged
+                if not pending:
+                    continue
+                # Commit with timestamp
+                mark += 1
+                when = dates[c_idx]
+                importer.stdin.write(fast_import_commit(message, when, author['username'], author['email'],
+                                                        mark, parent, pending))
+                parent = f':{mark}'
+                pending = {}
+                committed_by.append(author['username'])
+        importer.stdin.write(b'done\n')
+    except BrokenPipeError:
+        # fast-import exited early; its exit status is reported below
+        pass
+    finally:
+        try:
+            importer.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = importer.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, importer.args)
+    # Sync the index and working tree with the imported branch
+    run(['git', 'checkout', '-f', BRANCH])
 
     # Ensure > 13 commits per account
-    for user, cnt in author_counts.items():
-        if cnt <= 13:
-            raise RuntimeError(f'Author {user} has only {cnt} commits, must be > 13')
+    author_counts = Counter(committed_by)
+    bad = [f"{a['username']} ({author_counts[a['username']]})" for a in accounts if author_counts[a['username']] <= 13]
+    if bad:
+        raise RuntimeError(f'Authors with 13 or fewer commits: {", ".join(bad)}; each must have > 13')
 
     # Prepare remote and push using nanonkt001 token
     primary = next(a for a in accounts if a['username'] == 'nanonkt001')
@@ -521,18 +785,12 @@ def main() -> None:
     origin_url = f'https://{token}@github.com/nanonkt001/MintLite.git'
 
     # Ensure remote set
-    remotes = subprocess.run(['git', 'remote'], cwd=str(REPO_DIR), capture_output=True, text=True)
-    if 'origin' not in remotes.stdout:
-        run(['git', 'remote', 'add', 'origin', origin_url])
-    else:
-        run(['git', 'remote', 'set-url', 'origin', origin_url])
+    set_remote_url('origin', origin_url)
 
     # Create master branch pointing to main and push both
     run(['git', 'branch', '-f', 'master', 'main'])
-    # Use nanonkt001 for pushing
-    set_git_author(primary['username'], primary['email'])
-    run(['git', 'push', '-u', 'origin', 'main:main'])
-    run(['git', 'push', 'origin', 'master:master'])
+    # Push both branches over a single connection; the nanonkt001 token in the URL authenticates
+    run(['git', 'push', '-u', 'origin', 'main:main', 'master:master'])
 
     print('Done. Commits created and pushed to main and master.')
 